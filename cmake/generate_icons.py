@@ -6,14 +6,44 @@
 #   "pillow>=10.0.0",
 # ]
 # ///
+#
+# Resizing is the hot path here. Pillow-SIMD provides vectorized resampling
+# kernels; it is not declared above because it only ships as a source build.
+# This script uses Image.Resampling, so it needs pillow-simd>=9.1 (releases
+# based on Pillow 9.1 or newer; 9.0.0.post1 is too old). To use it, install
+# it in place of pillow and run this script with that interpreter directly.
+# Stock pillow is the fallback.
 
+import hashlib
+import io
 import os
+import shutil
+import struct
+import subprocess
 import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import Callable, Optional
 
 import typer
+import PIL
 from PIL import Image
 
+# Best-effort label for -v output only: Pillow-SIMD tags its releases with a
+# ".postN" suffix, but the version string alone can't prove which build this is
+PILLOW_SIMD = ".post" in PIL.__version__
+
+# C literal for every byte value, so header generation is a table lookup
+HEX_BYTES = [f"0x{b:02x}" for b in range(256)]
+
+# Output kinds selectable with --outputs
+OUTPUT_KINDS = ["png", "bmp", "ico", "icns", "headers"]
+
+# The script's own source feeds every stamp digest, so editing a generator
+# invalidates outputs produced by the old code
+SCRIPT_BYTES = Path(__file__).read_bytes()
+
 CONTEXT_SETTINGS = dict(help_option_names=["-h", "--help"])
 
 APP_NAME = "generate-icons"
@@ -27,49 +57,163 @@ app = typer.Typer(
 )
 
 
-def generate_bmp_from_png(png_path: Path, bmp_path: Path, size: tuple[int, int] = (32, 32)):
-    """Generate BMP icon from PNG source"""
+def content_digest(*parts: bytes) -> str:
+    """Hash inputs that determine an output, for freshness stamps"""
+    h = hashlib.blake2b(SCRIPT_BYTES, digest_size=16)
+    for part in parts:
+        h.update(len(part).to_bytes(8, 'little'))
+        h.update(part)
+    return h.hexdigest()
+
+
+def stamp_path(out_path: Path) -> Path:
+    """Sidecar file recording the digest an output was generated from"""
+    return out_path.with_name(out_path.name + ".stamp")
+
+
+def is_fresh(out_path: Path, digest: Optional[str]) -> bool:
+    """Check whether an output exists and was generated from the same inputs"""
+    if digest is None or not out_path.exists():
+        return False
+    stamp = stamp_path(out_path)
+    return stamp.exists() and stamp.read_text().strip() == digest
+
+
+def write_stamp(out_path: Path, digest: Optional[str]):
+    """Record the digest an output was generated from"""
+    if digest is not None:
+        stamp_path(out_path).write_text(digest + "\n")
+
+
+def mark_current(*out_paths: Path):
+    """Bump mtimes of skipped outputs so mtime-based build rules see them as rebuilt"""
+    for out_path in out_paths:
+        os.utime(out_path)
+
+
+def load_master(png_path: Path) -> Image.Image:
+    """Decode the source PNG once into an RGBA master image"""
+    with Image.open(png_path) as raw:
+        return raw.convert('RGBA').copy()
+
+
+def quality_resize(img: Image.Image, size: tuple[int, int]) -> Image.Image:
+    """Resize with LANCZOS, box-reducing to twice the target first on large downsamples"""
+    width, height = size
+    if img.width >= 4 * width and img.height >= 4 * height:
+        img = img.resize((width * 2, height * 2), Image.Resampling.BOX)
+    return img.resize(size, Image.Resampling.LANCZOS)
+
+
+def build_mipmap_chain(src_img: Image.Image, sizes: list[int]) -> dict[int, Image.Image]:
+    """Resize master image to square sizes, largest first
+    
+    each size is downsampled from the smallest entry already built that is at
+    least twice as big, so the small resizes read a small source. entries larger
+    than the master are upscaled copies and never used as a source; sizes the
+    chain can't cover are resized from the master.
+    """
+    chain = {}
+    for size in sorted(sizes, reverse=True):
+        candidates = [s for s in chain if s >= size * 2 and s <= min(src_img.size)]
+        source = chain[min(candidates)] if candidates else src_img
+        chain[size] = quality_resize(source, (size, size))
+    return chain
+
+
+def generate_png_bytes(src_img: Image.Image, size: tuple[int, int] = (64, 64)) -> bytes:
+    """Encode RGBA master image as an in-memory PNG"""
+    buf = io.BytesIO()
+    quality_resize(src_img, size).save(buf, 'PNG', compress_level=6)
+    return buf.getvalue()
+
+
+def generate_png_from_png(src_img: Image.Image, png_path: Path, size: tuple[int, int] = (64, 64),
+                          digest: Optional[str] = None, force: bool = False) -> Optional[bytes]:
+    """Generate resized PNG icon from RGBA master image, returning the encoded bytes"""
+    if not force and is_fresh(png_path, digest):
+        mark_current(png_path)
+        typer.echo(f"Up to date: {png_path}")
+        return png_path.read_bytes()
     try:
-        with Image.open(png_path) as img:
-            # Convert to RGB if needed (BMP doesn't support transparency)
-            if img.mode in ('RGBA', 'LA'):
-                # Create white background
-                background = Image.new('RGB', img.size, (255, 255, 255))
-                if img.mode == 'RGBA':
-                    background.paste(img, mask=img.split()[-1])  # Use alpha channel as mask
-                else:
-                    background.paste(img)
-                img = background
-            elif img.mode != 'RGB':
-                img = img.convert('RGB')
-            
-            # Resize to target size
-            img = img.resize(size, Image.Resampling.LANCZOS)
-            
-            # Save as BMP
-            img.save(bmp_path, 'BMP')
-            typer.echo(f"Generated BMP: {bmp_path}")
-            
+        data = generate_png_bytes(src_img, size)
+        png_path.write_bytes(data)
+        write_stamp(png_path, digest)
+        typer.echo(f"Generated high-res PNG: {png_path}")
+        return data
+    except Exception as e:
+        typer.echo(f"Error generating high-res PNG: {e}", err=True)
+        return None
+
+
+def generate_bmp_bytes(src_img: Image.Image, size: tuple[int, int] = (32, 32)) -> bytes:
+    """Encode RGBA master image as an in-memory BMP"""
+    # Resize to target size first; Pillow resamples RGBA with premultiplied
+    # alpha, so compositing afterwards touches only the output pixels
+    img = quality_resize(src_img, size)
+    
+    # Flatten onto white background (BMP doesn't support transparency)
+    background = Image.new('RGBA', img.size, (255, 255, 255, 255))
+    img = Image.alpha_composite(background, img).convert('RGB')
+    
+    return emit_bgr_bmp(img)
+
+
+def emit_bgr_bmp(img: Image.Image) -> bytes:
+    """Encode an RGB image as an uncompressed 24-bit BMP without Pillow's generic writer"""
+    width, height = img.size
+    row_size = width * 3
+    padding = -row_size % 4
+    
+    # BMP rows are BGR and bottom-up; Pillow's raw packer emits that in one C call
+    pixels = img.tobytes('raw', 'BGR', 0, -1)
+    if padding:
+        pad = b"\0" * padding
+        pixels = b"".join(pixels[i:i + row_size] + pad for i in range(0, len(pixels), row_size))
+    
+    # 96 dpi in pixels per metre, matching what Pillow's writer records
+    ppm = 3780
+    offset = 14 + 40
+    file_header = struct.pack('<2sIHHI', b"BM", offset + len(pixels), 0, 0, offset)
+    info_header = struct.pack('<IiiHHIIiiII', 40, width, height, 1, 24, 0, len(pixels), ppm, ppm, 0, 0)
+    return file_header + info_header + pixels
+
+
+def generate_bmp_from_png(src_img: Image.Image, bmp_path: Path, size: tuple[int, int] = (32, 32),
+                          digest: Optional[str] = None, force: bool = False) -> bytes:
+    """Generate BMP icon from RGBA master image, returning the encoded bytes"""
+    if not force and is_fresh(bmp_path, digest):
+        mark_current(bmp_path)
+        typer.echo(f"Up to date: {bmp_path}")
+        return bmp_path.read_bytes()
+    try:
+        data = generate_bmp_bytes(src_img, size)
+        bmp_path.write_bytes(data)
+        write_stamp(bmp_path, digest)
+        typer.echo(f"Generated BMP: {bmp_path}")
+        return data
+        
     except Exception as e:
         typer.echo(f"Error generating BMP: {e}", err=True)
         raise
 
 
-def generate_ico_from_png(png_path: Path, ico_path: Path, sizes: list[int] = [16, 32, 48, 64]):
-    """Generate ICO file from PNG source with multiple sizes"""
+def generate_ico_from_png(src_img: Image.Image, ico_path: Path, sizes: list[int] = [16, 32, 48, 64],
+                          digest: Optional[str] = None, force: bool = False):
+    """Generate ICO file from RGBA master image with multiple sizes"""
+    if not force and is_fresh(ico_path, digest):
+        mark_current(ico_path)
+        typer.echo(f"Up to date: {ico_path}")
+        return
     try:
-        images = []
-        with Image.open(png_path) as img:
-            # Convert to RGBA for ICO
-            if img.mode != 'RGBA':
-                img = img.convert('RGBA')
-            
-            for size in sizes:
-                resized = img.resize((size, size), Image.Resampling.LANCZOS)
-                images.append(resized)
+        chain = build_mipmap_chain(src_img, sizes)
+        images = [chain[size] for size in sorted(sizes, reverse=True)]
         
-        # Save as ICO with multiple sizes
-        images[0].save(ico_path, format='ICO', sizes=[(img.width, img.height) for img in images])
+        # Save as ICO with multiple sizes; passing the resized images means
+        # Pillow stores them as-is instead of resampling images[0] again
+        images[0].save(ico_path, format='ICO', append_images=images[1:],
+                       sizes=[(img.width, img.height) for img in images])
+        write_stamp(ico_path, digest)
         typer.echo(f"Generated ICO: {ico_path}")
         
     except Exception as e:
@@ -77,85 +221,129 @@ def generate_ico_from_png(png_path: Path, ico_path: Path, sizes: list[int] = [16
         raise
 
 
-def generate_icns_from_png(png_path: Path, icns_path: Path):
-    """Generate ICNS file from PNG source (macOS)"""
+def icns_output_path(icns_path: Path) -> Path:
+    """File the ICNS generator produces: the .icns, or the PNG fallback without iconutil"""
+    return icns_path if shutil.which('iconutil') else icns_path.with_suffix('.png')
+
+
+def write_icns_fallback(src_img: Image.Image, fallback_path: Path, digest: Optional[str] = None):
+    """Write the PNG stand-in used when iconutil is unavailable"""
+    typer.echo("iconutil not found - creating PNG-based ICNS fallback", err=True)
+    # Fallback: just copy the largest PNG
+    img = quality_resize(src_img, (512, 512))
+    img.save(fallback_path, 'PNG')
+    write_stamp(fallback_path, digest)
+
+
+def generate_icns_from_png(src_img: Image.Image, icns_path: Path, digest: Optional[str] = None,
+                           force: bool = False) -> Optional[Callable[[], None]]:
+    """Generate ICNS file from RGBA master image (macOS)
+    
+    iconutil runs in the background; the returned callable waits for it and
+    removes the scratch iconset. None means there is nothing left to wait for.
+    """
+    out_path = icns_output_path(icns_path)
+    if not force and is_fresh(out_path, digest):
+        mark_current(out_path)
+        typer.echo(f"Up to date: {out_path}")
+        return None
+    
+    # Without iconutil there is no iconset to build, only the fallback PNG
+    if out_path != icns_path:
+        write_icns_fallback(src_img, out_path, digest)
+        return None
+    
+    # Scratch iconset in the system temp dir (tmpfs on Linux, $TMPDIR on macOS);
+    # iconutil requires the .iconset suffix
+    temp = tempfile.TemporaryDirectory(prefix='iconset_', suffix='.iconset')
     try:
+        temp_dir = Path(temp.name)
+        
         # ICNS requires specific sizes
         icns_sizes = [16, 32, 64, 128, 256, 512, 1024]
-        temp_dir = icns_path.parent / "iconset.tmp"
-        temp_dir.mkdir(exist_ok=True)
         
-        with Image.open(png_path) as img:
-            # Convert to RGBA
-            if img.mode != 'RGBA':
-                img = img.convert('RGBA')
-            
-            # Generate all required sizes
-            for size in icns_sizes:
-                resized = img.resize((size, size), Image.Resampling.LANCZOS)
-                
-                # Generate standard resolution
-                icon_name = f"icon_{size}x{size}.png"
-                resized.save(temp_dir / icon_name, 'PNG')
-                
-                # Generate @2x (retina) versions for applicable sizes
-                if size <= 512:
-                    retina_size = size * 2
-                    if retina_size <= 1024:
-                        retina_resized = img.resize((retina_size, retina_size), Image.Resampling.LANCZOS)
-                        retina_name = f"icon_{size}x{size}@2x.png"
-                        retina_resized.save(temp_dir / retina_name, 'PNG')
+        chain = build_mipmap_chain(src_img, icns_sizes)
+        
+        def save(size: int):
+            # Throwaway input for iconutil, so skip the expensive deflate
+            chain[size].save(temp_dir / f"icon_{size}x{size}.png", 'PNG', compress_level=1, optimize=False)
+        
+        # Encode each pixel size once; Pillow releases the GIL while encoding, so threads scale
+        with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+            list(executor.map(save, icns_sizes))
+        
+        # @2x (retina) variants have the same pixels as the next size up, so link to it
+        for size in icns_sizes:
+            if size * 2 in chain:
+                standard = temp_dir / f"icon_{size * 2}x{size * 2}.png"
+                retina = temp_dir / f"icon_{size}x{size}@2x.png"
+                try:
+                    os.link(standard, retina)
+                except OSError:
+                    shutil.copyfile(standard, retina)
         
         # Use iconutil to create ICNS (macOS only)
-        import subprocess
         try:
-            subprocess.run(['iconutil', '-c', 'icns', str(temp_dir), '-o', str(icns_path)], 
-                         check=True, capture_output=True)
-            typer.echo(f"Generated ICNS: {icns_path}")
-        except subprocess.CalledProcessError as e:
-            typer.echo(f"Error running iconutil: {e}", err=True)
-            typer.echo("Note: iconutil is only available on macOS", err=True)
+            proc = subprocess.Popen(['iconutil', '-c', 'icns', str(temp_dir), '-o', str(icns_path)],
+                                    stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
         except FileNotFoundError:
-            typer.echo("iconutil not found - creating PNG-based ICNS fallback", err=True)
-            # Fallback: just copy the largest PNG
-            with Image.open(png_path) as img:
-                img = img.resize((512, 512), Image.Resampling.LANCZOS)
-                img.save(icns_path.with_suffix('.png'), 'PNG')
-        
-        # Cleanup
-        import shutil
-        shutil.rmtree(temp_dir, ignore_errors=True)
-        
+            write_icns_fallback(src_img, icns_path.with_suffix('.png'), digest)
+            temp.cleanup()
+            return None
+    
     except Exception as e:
+        temp.cleanup()
         typer.echo(f"Error generating ICNS: {e}", err=True)
         raise
+    
+    def finish():
+        try:
+            _, stderr = proc.communicate()
+            if proc.returncode == 0:
+                write_stamp(icns_path, digest)
+                typer.echo(f"Generated ICNS: {icns_path}")
+            else:
+                message = stderr.decode(errors='replace').strip()
+                typer.echo(f"Error running iconutil (exit {proc.returncode}): {message}", err=True)
+                typer.echo("Note: iconutil is only available on macOS", err=True)
+        finally:
+            temp.cleanup()
+    
+    return finish
 
 
-def generate_c_header(icon_path: Path, header_path: Path, array_name: str = "app_icon_data"):
+def write_c_header_bytes(data: bytes, header_path: Path, array_name: str = "app_icon_data",
+                         source_name: str = "memory", digest: Optional[str] = None,
+                         force: bool = False):
     """generate c header file with embedded icon data"""
+    if not force and is_fresh(header_path, digest):
+        mark_current(header_path)
+        typer.echo(f"up to date: {header_path}")
+        return
     try:
-        with open(icon_path, 'rb') as f:
-            data = f.read()
+        size_name = array_name.replace('_data', '_size')
         
+        # bytes in rows of 16
+        rows = [
+            "    " + ", ".join([HEX_BYTES[b] for b in data[i:i+16]])
+            for i in range(0, len(data), 16)
+        ]
+        
+        # assemble the whole header in memory and write it in one go
+        parts = [
+            f"// auto-generated icon data from {source_name}\n",
+            f"#pragma once\n\n",
+            f"#include <stddef.h>\n\n",
+            f"extern const unsigned char {array_name}[];\n",
+            f"extern const size_t {size_name};\n\n",
+            f"const unsigned char {array_name}[] = {{\n",
+            ",\n".join(rows) + "\n" if rows else "",
+            f"}};\n\n",
+            f"const size_t {size_name} = sizeof({array_name});\n",
+        ]
         with open(header_path, 'w') as f:
-            f.write(f"// auto-generated icon data from {icon_path.name}\n")
-            f.write(f"#pragma once\n\n")
-            f.write(f"#include <stddef.h>\n\n")
-            f.write(f"extern const unsigned char {array_name}[];\n")
-            f.write(f"extern const size_t {array_name.replace('_data', '_size')};\n\n")
-            f.write(f"const unsigned char {array_name}[] = {{\n")
-            
-            # write bytes in groups of 16
-            for i in range(0, len(data), 16):
-                chunk = data[i:i+16]
-                hex_values = [f"0x{b:02x}" for b in chunk]
-                f.write(f"    {', '.join(hex_values)}")
-                if i + 16 < len(data):
-                    f.write(",")
-                f.write("\n")
-            
-            f.write(f"}};\n\n")
-            f.write(f"const size_t {array_name.replace('_data', '_size')} = sizeof({array_name});\n")
+            f.write("".join(parts))
+        write_stamp(header_path, digest)
         
         typer.echo(f"generated c header: {header_path}")
         
@@ -164,6 +352,76 @@ def generate_c_header(icon_path: Path, header_path: Path, array_name: str = "app
         raise
 
 
+def write_c_incbin(data: bytes, header_path: Path, array_name: str = "app_icon_data",
+                   source_name: str = "memory", digest: Optional[str] = None,
+                   force: bool = False):
+    """generate raw blob, .incbin stub and declaring header for embedded icon data
+    
+    the assembler pulls the bytes in directly, so nothing has to parse a
+    literal per byte. gcc/clang only - msvc has no .incbin, use the c array there.
+    """
+    bin_path = header_path.with_suffix('.bin')
+    stub_path = header_path.with_suffix('.c')
+    siblings_exist = bin_path.exists() and stub_path.exists()
+    if not force and siblings_exist and is_fresh(header_path, digest):
+        mark_current(header_path, bin_path, stub_path)
+        typer.echo(f"up to date: {header_path}")
+        return
+    try:
+        size_name = array_name.replace('_data', '_size')
+        
+        bin_path.write_bytes(data)
+        
+        header = [
+            f"// auto-generated icon data declarations for {source_name}\n",
+            f"#pragma once\n\n",
+            f"#include <stddef.h>\n\n",
+            f"#ifdef __cplusplus\n",
+            f"extern \"C\" {{\n",
+            f"#endif\n\n",
+            f"extern const unsigned char {array_name}[];\n",
+            f"extern const size_t {size_name};\n\n",
+            f"#ifdef __cplusplus\n",
+            f"}}\n",
+            f"#endif\n",
+        ]
+        with open(header_path, 'w') as f:
+            f.write("".join(header))
+        
+        stub = [
+            f"// auto-generated icon data from {source_name} (gcc/clang .incbin)\n",
+            f"#include \"{header_path.name}\"\n\n",
+            f"// override with -DICON_INCBIN_DIR=... if the blob moves\n",
+            f"#ifndef ICON_INCBIN_DIR\n",
+            f"#define ICON_INCBIN_DIR \"{bin_path.parent.resolve().as_posix()}\"\n",
+            f"#endif\n\n",
+            f"#ifdef __APPLE__\n",
+            f"#define ICON_SECTION \".const_data\\n\"\n",
+            f"#define ICON_SYMBOL(name) \"_\" name\n",
+            f"#else\n",
+            f"#define ICON_SECTION \".section .rodata\\n\"\n",
+            f"#define ICON_SYMBOL(name) name\n",
+            f"#endif\n\n",
+            f"__asm__(\n",
+            f"    ICON_SECTION\n",
+            f"    \".globl \" ICON_SYMBOL(\"{array_name}\") \"\\n\"\n",
+            f"    \".balign 16\\n\"\n",
+            f"    ICON_SYMBOL(\"{array_name}\") \":\\n\"\n",
+            f"    \".incbin \\\"\" ICON_INCBIN_DIR \"/{bin_path.name}\\\"\\n\"\n",
+            f"    \".text\\n\");\n\n",
+            f"const size_t {size_name} = {len(data)};\n",
+        ]
+        with open(stub_path, 'w') as f:
+            f.write("".join(stub))
+        write_stamp(header_path, digest)
+        
+        typer.echo(f"generated incbin header: {header_path}")
+        
+    except Exception as e:
+        typer.echo(f"error generating incbin header: {e}", err=True)
+        raise
+
+
 def generate_combined_header(header_path: Path, base_name: str):
     """generate combined header that includes both png and bmp data"""
     try:
@@ -193,6 +451,10 @@ def cli(
     input_png: str = typer.Argument(..., help="Input PNG file path"),
     output_dir: str = typer.Option(".", "-o", help="Output directory"),
     generate_header: bool = typer.Option(True, "--header/--no-header", help="Generate C header file"),
+    incbin: bool = typer.Option(False, "--incbin", help="Embed icon data via .incbin stubs instead of C arrays (gcc/clang)"),
+    force: bool = typer.Option(False, "--force", help="Regenerate outputs even if their stamps are current"),
+    outputs: str = typer.Option(",".join(OUTPUT_KINDS), "--outputs",
+                                help=f"Comma-separated subset of {','.join(OUTPUT_KINDS)} to generate"),
     verbose: bool = typer.Option(False, "-v", help="Verbose output"),
 ):
     """Generate platform-specific icons from a PNG source image"""
@@ -207,55 +469,90 @@ def cli(
     
     base_name = png_path.stem
     
+    selected = {kind.strip() for kind in outputs.split(",") if kind.strip()}
+    unknown = selected - set(OUTPUT_KINDS)
+    if unknown:
+        typer.echo(f"Error: Unknown output kind(s): {', '.join(sorted(unknown))}", err=True)
+        raise typer.Exit(1)
+    if not generate_header:
+        selected.discard("headers")
+    if "headers" in selected:
+        # headers embed the png and bmp, so both have to be produced
+        selected |= {"png", "bmp"}
+    
     if verbose:
         typer.echo(f"Generating icons from: {png_path}")
         typer.echo(f"Output directory: {output_path}")
+        typer.echo(f"Imaging backend: {'pillow-simd' if PILLOW_SIMD else 'pillow'} {PIL.__version__}")
     
-    # Generate high-res PNG for embedding (with SDL_image)
     icon_png_path = output_path / f"{base_name}_64.png"
-    try:
-        with Image.open(png_path) as img:
-            img = img.resize((64, 64), Image.Resampling.LANCZOS)
-            img.save(icon_png_path, 'PNG')
-            typer.echo(f"Generated high-res PNG: {icon_png_path}")
-    except Exception as e:
-        typer.echo(f"Error generating high-res PNG: {e}", err=True)
-    
-    # Generate BMP for fallback (without SDL_image)
     bmp_path = output_path / f"{base_name}_32.bmp"
-    generate_bmp_from_png(png_path, bmp_path, (32, 32))
-    
-    # Generate ICO for Windows
     ico_path = output_path / f"{base_name}.ico"
-    generate_ico_from_png(png_path, ico_path)
-    
-    # Generate ICNS for macOS
     icns_path = output_path / f"{base_name}.icns"
-    generate_icns_from_png(png_path, icns_path)
     
-    # Generate large PNG for Linux
-    linux_png_path = output_path / f"{base_name}_64.png"
-    try:
-        with Image.open(png_path) as img:
-            img = img.resize((64, 64), Image.Resampling.LANCZOS)
-            img.save(linux_png_path, 'PNG')
-            typer.echo(f"Generated Linux PNG: {linux_png_path}")
-    except Exception as e:
-        typer.echo(f"Error generating Linux PNG: {e}", err=True)
+    # Outputs whose stamp matches this digest are left alone unless forced;
+    # forced outputs are still stamped so later runs see them as current
+    digest = content_digest(png_path.read_bytes())
     
-    # generate c header for embedding - create dual version for png and bmp
-    if generate_header:
-        # generate png header (high quality)
-        png_header_path = output_path / f"{base_name}_icon_png.h"
-        generate_c_header(icon_png_path, png_header_path, "app_icon_png_data")
-        
-        # generate bmp header (fallback)
-        bmp_header_path = output_path / f"{base_name}_icon_bmp.h"
-        generate_c_header(bmp_path, bmp_header_path, "app_icon_bmp_data")
+    image_paths = {"png": icon_png_path, "bmp": bmp_path, "ico": ico_path, "icns": icns_output_path(icns_path)}
+    generators = {
+        # High-res PNG for embedding (with SDL_image); also serves as the Linux icon
+        "png": lambda: generate_png_from_png(master, icon_png_path, (64, 64), digest, force),
+        # BMP for fallback (without SDL_image)
+        "bmp": lambda: generate_bmp_from_png(master, bmp_path, (32, 32), digest, force),
+        # ICO for Windows
+        "ico": lambda: generate_ico_from_png(master, ico_path, digest=digest, force=force),
+        # ICNS for macOS
+        "icns": lambda: generate_icns_from_png(master, icns_path, digest, force),
+    }
+    wanted = [kind for kind in generators if kind in selected]
+    
+    # Decode the source once, and only if some output actually needs it
+    master = None
+    if force or not all(is_fresh(image_paths[kind], digest) for kind in wanted):
+        master = load_master(png_path)
+    
+    # The generators are independent and Pillow releases the GIL while
+    # resampling and encoding, so run them side by side
+    with ThreadPoolExecutor(max_workers=max(len(wanted), 1)) as executor:
+        futures = {kind: executor.submit(generators[kind]) for kind in wanted}
+    
+    # iconutil may still be running; take its finish callable before any other
+    # generator's error can propagate, so it is always waited on and cleaned up
+    icns_future = futures.get("icns")
+    finish_icns = None
+    if icns_future is not None and icns_future.exception() is None:
+        finish_icns = icns_future.result()
+    try:
+        results = {kind: future.result() for kind, future in futures.items()}
         
-        # generate combined header
-        combined_header_path = output_path / f"{base_name}_icon.h"
-        generate_combined_header(combined_header_path, base_name)
+        # generate c header for embedding - create dual version for png and bmp;
+        # these only need the png and bmp, so they overlap with iconutil
+        if "headers" in selected:
+            # generate png header (high quality)
+            write_header = write_c_incbin if incbin else write_c_header_bytes
+            mode = b"incbin" if incbin else b"array"
+            
+            png_header_path = output_path / f"{base_name}_icon_png.h"
+            png_data = results["png"]
+            if png_data is None:
+                typer.echo("Error: high-res PNG unavailable, cannot generate headers", err=True)
+                raise typer.Exit(1)
+            png_digest = content_digest(png_data, mode)
+            write_header(png_data, png_header_path, "app_icon_png_data", icon_png_path.name, png_digest, force)
+            
+            # generate bmp header (fallback)
+            bmp_header_path = output_path / f"{base_name}_icon_bmp.h"
+            bmp_data = results["bmp"]
+            bmp_digest = content_digest(bmp_data, mode)
+            write_header(bmp_data, bmp_header_path, "app_icon_bmp_data", bmp_path.name, bmp_digest, force)
+            
+            # generate combined header
+            combined_header_path = output_path / f"{base_name}_icon.h"
+            generate_combined_header(combined_header_path, base_name)
+    finally:
+        if finish_icns is not None:
+            finish_icns()
     
     typer.echo("Icon generation complete!")
 